@@ -0,0 +1,231 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+import logging
+import os
+import subprocess
+import tempfile
+import threading
+from functools import lru_cache
+from shutil import rmtree
+from typing import Optional
+
+# Multiplex the ssh connections to a host over one master connection, the clones and pushes skip the handshake
+SSH_COMMAND = (
+    "ssh -o ControlMaster=auto -o ControlPath={control_dir}/%C -o ControlPersist=60"
+)
+
+# lru_cache does not serialize concurrent misses, the first git commands of the clone workers run at the same time
+_git_env_lock = threading.Lock()
+
+
+@lru_cache(maxsize=None)
+def _ssh_control_dir() -> str:
+    """
+    Creates the private directory (mode 0700) holding the sockets of the ssh master connections.
+
+    Returns:
+        str: The directory path.
+    """
+    # A short path keeps the socket paths below the unix socket length limit
+    return tempfile.mkdtemp(prefix="repo-migration-ssh-", dir="/tmp")
+
+
+def close_ssh_connections() -> None:
+    """
+    Stops the ssh master connections opened by the git commands and deletes their sockets.
+    """
+    if _ssh_control_dir.cache_info().currsize == 0:
+        return
+
+    control_dir = _ssh_control_dir()
+    for entry in os.scandir(control_dir):
+        # The socket path identifies the master connection, the host argument is not used
+        subprocess.run(
+            ["ssh", "-o", f"ControlPath={entry.path}", "-O", "exit", "localhost"],
+            capture_output=True,
+        )
+    rmtree(control_dir, ignore_errors=True)
+
+
+def _git_env() -> dict[str, str]:
+    """
+    Gets the environment of the git commands, it is built by the first caller only.
+
+    Returns:
+        dict[str, str]: The environment variables.
+    """
+    with _git_env_lock:
+        return _build_git_env()
+
+
+@lru_cache(maxsize=None)
+def _build_git_env() -> dict[str, str]:
+    """
+    Builds the environment of the git commands once, they fail instead of prompting for credentials.
+
+    Returns:
+        dict[str, str]: The environment variables.
+    """
+    config = {}
+    # Keep the ssh command configured by the user, $GIT_SSH_COMMAND and $GIT_SSH take precedence anyway
+    if (
+        os.name == "posix"
+        and subprocess.run(
+            ["git", "config", "--get", "core.sshCommand"], capture_output=True
+        ).returncode
+        != 0
+    ):
+        config["core.sshCommand"] = SSH_COMMAND.format(control_dir=_ssh_control_dir())
+
+    env = {**os.environ, "GIT_TERMINAL_PROMPT": "0"}
+    # Append to the configuration values that may already be set in the environment
+    count = int(env.get("GIT_CONFIG_COUNT", 0))
+    for key, value in config.items():
+        env[f"GIT_CONFIG_KEY_{count}"] = key
+        env[f"GIT_CONFIG_VALUE_{count}"] = value
+        count += 1
+    env["GIT_CONFIG_COUNT"] = str(count)
+    return env
+
+
+def run_git(*args: str, input: Optional[str] = None) -> subprocess.CompletedProcess:
+    """
+    Runs a git command, failing instead of prompting for credentials.
+
+    Args:
+        args (str): The git command line arguments.
+        input (Optional[str]): The standard input of the git command.
+
+    Returns:
+        subprocess.CompletedProcess: The completed git process.
+
+    Raises:
+        subprocess.CalledProcessError: If the git command failed.
+    """
+    return subprocess.run(
+        ["git", *args],
+        check=True,
+        capture_output=True,
+        text=True,
+        input=input,
+        env=_git_env(),
+    )
+
+
+def clone_repository(
+    url: str,
+    path: str,
+    shallow: bool = False,
+    partial_clone: bool = False,
+    default_branch_only: bool = False,
+) -> None:
+    """
+    Clones a repository as a bare repository holding all its branches and tags, an existing full clone is updated.
+
+    Args:
+        url (str): The clone url of the repository.
+        path (str): The local path to clone the repository to.
+        shallow (bool): Whether to only clone the latest commit of the default branch.
+        partial_clone (bool): Whether to defer the download of the file contents until they are pushed.
+        default_branch_only (bool): Whether to only clone the default branch and its tags, with its full history.
+    """
+    options = ["--filter=blob:none"] if partial_clone else []
+
+    if shallow:
+        # Only fetch the tip of the default branch, other branches, tags and history are dropped
+        options += ["--depth=1", "--no-tags"]
+
+    if shallow or default_branch_only:
+        # The server only packs the objects reachable from the default branch
+        result = run_git(
+            "clone",
+            "--bare",
+            "--single-branch",
+            *options,
+            url,
+            path,
+        )
+    else:
+        # Fetch the branches and tags straight into an empty bare repository, other refs
+        # (eg: refs/pull/*) are hidden refs that the destination would reject
+        run_git("init", "--bare", "--quiet", path)
+        run_git("-C", path, "config", "remote.origin.url", url)
+        result = run_git(
+            "-C",
+            path,
+            "fetch",
+            "--prune",
+            *options,
+            "origin",
+            "+refs/heads/*:refs/heads/*",
+            "+refs/tags/*:refs/tags/*",
+        )
+
+    # Single-commit repositories are not shallow, there is nothing to rewrite
+    if shallow and os.path.exists(os.path.join(path, "shallow")):
+        _make_root_commit(path)
+
+    if partial_clone and "filtering not recognized by server" in result.stderr:
+        logging.info(
+            "%s does not support partial clones, the file contents have been downloaded",
+            url,
+        )
+
+
+def _make_root_commit(path: str) -> None:
+    """
+    Rewrites the tip of a shallow clone into a commit without parents, servers reject the pushes of shallow histories.
+
+    Args:
+        path (str): The local path of the shallow bare repository.
+    """
+    ref = run_git("-C", path, "symbolic-ref", "HEAD").stdout.strip()
+    headers, _, message = run_git(
+        "-C", path, "cat-file", "commit", ref
+    ).stdout.partition("\n\n")
+
+    # Keep the tree, author, committer and message, drop the parents and the signatures they invalidate
+    kept_headers = []
+    signature = False
+    for line in headers.split("\n"):
+        if line.startswith(" "):
+            # Continuation line of a multi-line header
+            if not signature:
+                kept_headers.append(line)
+            continue
+        signature = line.startswith(("gpgsig", "mergetag"))
+        if not signature and not line.startswith("parent "):
+            kept_headers.append(line)
+
+    root = run_git(
+        "-C",
+        path,
+        "hash-object",
+        "-t",
+        "commit",
+        "-w",
+        "--stdin",
+        input="\n".join(kept_headers) + "\n\n" + message,
+    ).stdout.strip()
+    run_git("-C", path, "update-ref", ref, root)
+
+
+def push_repository(path: str, url: str) -> None:
+    """
+    Pushes all the branches and tags of a local repository to a remote repository.
+
+    Args:
+        path (str): The local path of the repository.
+        url (str): The url of the remote repository.
+    """
+    # Atomic pushes update all the refs in a single transaction, either all or none of them are pushed
+    try:
+        run_git("-C", path, "push", "--mirror", "--atomic", url)
+    except subprocess.CalledProcessError as ex:
+        if "does not support --atomic push" not in ex.stderr:
+            raise
+        logging.debug(
+            "%s does not support atomic pushes, pushing the refs one by one", url
+        )
+        run_git("-C", path, "push", "--mirror", url)
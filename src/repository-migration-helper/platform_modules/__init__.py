@@ -1,4 +1,5 @@
 # Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
 # SPDX-License-Identifier: MIT-0
 
+from platform_modules.platform_interface import RepositoryNotFound
 from platform_modules.platform_strategy import PLATFORMS, get_platform_client
@@ -2,30 +2,57 @@
 # SPDX-License-Identifier: MIT-0
 
 import logging
+from functools import lru_cache
 from typing import Optional
 
 import boto3
-from platform_modules.platform_interface import GitPlatform
+from botocore.config import Config
+from platform_modules.platform_interface import GitPlatform, RepositoryNotFound
+
+
+@lru_cache(maxsize=None)
+def _get_validated_session(profile: str, region: str) -> boto3.Session:
+    """
+    Creates and validates a session, the session is reused for the same profile and region.
+
+    Args:
+        profile (str): The name of the AWS CLI profile.
+        region (str): The AWS region, the default region of the profile is used if empty.
+
+    Returns:
+        boto3.Session: The validated session.
+    """
+    if region:
+        session = boto3.Session(profile_name=profile, region_name=region)
+    else:
+        session = boto3.Session(profile_name=profile)
+
+    assert CodecommitModule.validate_session(session=session)
+    return session
 
 
 class CodecommitModule(GitPlatform):
 
-    def __init__(self, *args, **kwargs):
+    def __init__(self, *args, max_pool_connections: int = 10, **kwargs):
         super().__init__(self)
         # Create sessions for the codecommit account, use the default region if not specified
         self.prompt_config()
         if not self.profile:
             self.profile = "default"
-        if self.region:
-            self.session = boto3.Session(
-                profile_name=self.profile, region_name=self.region
-            )
-        else:
-            self.session = boto3.Session(profile_name=self.profile)
+        # Source and destination often share the same profile and region, validate them only once
+        self.session = _get_validated_session(self.profile, self.region)
+        if not self.region:
             self.region = self.session.region_name
 
-        assert self.validate_session(session=self.session)
-        self.client = self.session.client("codecommit")
+        # Size the connection pool for the concurrent migration workers and back off adaptively when throttled
+        self.client = self.session.client(
+            "codecommit",
+            config=Config(
+                max_pool_connections=max_pool_connections,
+                retries={"mode": "adaptive", "max_attempts": 10},
+                tcp_keepalive=True,
+            ),
+        )
 
     def prompt_config(self):
         print(
@@ -35,7 +62,8 @@ class CodecommitModule(GitPlatform):
         print("Please enter the AWS Region (leave blank for default region):")
         self.region = input()
 
-    def validate_session(self, session: boto3.Session) -> bool:
+    @staticmethod
+    def validate_session(session: boto3.Session) -> bool:
         """
         Validates the provided session by checking if the caller identity can be retrieved.
 
@@ -67,24 +95,38 @@ class CodecommitModule(GitPlatform):
             list: A list of repository names.
         """
 
-        # Get a list of repositories in the source account
-        repository_list = []
-        list_repositories_response = self.client.list_repositories()
-        repository_list.extend(
+        # Get a list of repositories in the source account, the paginator follows the nextToken (batch sizes are 1000 for list repositories operations)
+        paginator = self.client.get_paginator("list_repositories")
+        repository_list = [
             repo.get("repositoryName")
-            for repo in list_repositories_response.get("repositories", [])
-        )
-        # Cycling through potential pagination of the repository list (batch sizes are 1000 for list repositories operations)
-        while "nextToken" in list_repositories_response:
-            list_repositories_response = self.client.list_repositories(
-                nextToken=list_repositories_response["nextToken"]
+            for page in paginator.paginate()
+            for repo in page.get("repositories", [])
+        ]
+
+        return repository_list
+
+    def get_existing_repositories(self, repository_names: list[str]) -> frozenset[str]:
+        """
+        Gets the codecommit repositories that already exist in the AWS account.
+
+        Args:
+            repository_names (list[str]): The names of the repositories to check.
+
+        Returns:
+            frozenset: The names of the repositories that exist in the AWS account.
+        """
+        existing_repositories = set()
+        # Batch get repositories operations accept up to 25 repository names
+        for i in range(0, len(repository_names), 25):
+            batch_get_repositories_response = self.client.batch_get_repositories(
+                repositoryNames=repository_names[i : i + 25]
             )
-            repository_list.extend(
+            existing_repositories.update(
                 repo.get("repositoryName")
-                for repo in list_repositories_response.get("repositories", [])
+                for repo in batch_get_repositories_response.get("repositories", [])
             )
 
-        return repository_list
+        return frozenset(existing_repositories)
 
     def get_repository(self, repository_name: str) -> dict:
         """
@@ -95,8 +137,14 @@ class CodecommitModule(GitPlatform):
 
         Returns:
             dict: The repository object.
+
+        Raises:
+            RepositoryNotFound: If the repository does not exist.
         """
-        repository_info = self.client.get_repository(repositoryName=repository_name)
+        try:
+            repository_info = self.client.get_repository(repositoryName=repository_name)
+        except self.client.exceptions.RepositoryDoesNotExistException:
+            raise RepositoryNotFound(repository_name) from None
         output = {
             "repository_name": repository_info.get("repositoryMetadata").get(
                 "repositoryName"
@@ -104,6 +152,9 @@ class CodecommitModule(GitPlatform):
             "repository_description": repository_info.get("repositoryMetadata", {}).get(
                 "repositoryDescription", ""
             ),
+            "default_branch": repository_info.get("repositoryMetadata", {}).get(
+                "defaultBranch"
+            ),
             "clone_url": f"codecommit::{self.region}://{self.profile}@{repository_name}",
         }
         return output
@@ -134,3 +185,24 @@ class CodecommitModule(GitPlatform):
             "clone_url": f"codecommit::{self.region}://{self.profile}@{repository_name}",
         }
         return output
+
+    def get_branch_commit(
+        self, repository_name: str, branch_name: str
+    ) -> Optional[str]:
+        """
+        Gets the id of the latest commit of a codecommit repository branch.
+
+        Args:
+            repository_name (str): The name of the repository.
+            branch_name (str): The name of the branch.
+
+        Returns:
+            Optional[str]: The commit id, None if the branch does not exist.
+        """
+        try:
+            branch_info = self.client.get_branch(
+                repositoryName=repository_name, branchName=branch_name
+            )
+        except self.client.exceptions.BranchDoesNotExistException:
+            return None
+        return branch_info.get("branch", {}).get("commitId")
@@ -1,25 +1,35 @@
 # Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
 # SPDX-License-Identifier: MIT-0
 
+import json
 import logging
+import math
+from concurrent.futures import ThreadPoolExecutor
 from getpass import getpass
 from typing import Optional
 
-from github import Auth, Github
+from github import Auth, Github, GithubException, UnknownObjectException
 from github.AuthenticatedUser import AuthenticatedUser
-from platform_modules.platform_interface import GitPlatform
+from platform_modules.platform_interface import GitPlatform, RepositoryNotFound
 
 
 class GithubModule(GitPlatform):
 
-    def __init__(self, *args, **kwargs):
+    def __init__(self, *args, max_pool_connections: int = 10, **kwargs):
         super().__init__(self)
         self.prompt_config()
         auth = Auth.Token(self.token)
+        # Use the largest page size to reduce the number of API calls when listing repositories,
+        # and keep a connection open for each concurrent migration worker
         self.session = (
-            Github(auth=auth, base_url=f"https://{self.custom_hostname}/api/v3")
+            Github(
+                auth=auth,
+                base_url=f"https://{self.custom_hostname}/api/v3",
+                per_page=100,
+                pool_size=max_pool_connections,
+            )
             if self.custom_hostname
-            else Github(auth=auth)
+            else Github(auth=auth, per_page=100, pool_size=max_pool_connections)
         )
         self.client = (
             self.session.get_organization(self.organization)
@@ -51,7 +61,18 @@ class GithubModule(GitPlatform):
             if isinstance(self.client, AuthenticatedUser)
             else self.client.get_repos()
         )
-        repository_list = [repo.name for repo in list_repositories_response]
+        # The total count gives the number of pages, which are then fetched concurrently
+        page_count = math.ceil(
+            list_repositories_response.totalCount / self.session.per_page
+        )
+        with ThreadPoolExecutor() as executor:
+            repository_list = [
+                repo.name
+                for page in executor.map(
+                    list_repositories_response.get_page, range(page_count)
+                )
+                for repo in page
+            ]
 
         return repository_list
 
@@ -64,13 +85,20 @@ class GithubModule(GitPlatform):
 
         Returns:
             dict: The repository object.
+
+        Raises:
+            RepositoryNotFound: If the repository does not exist.
         """
-        repository_info = self.client.get_repo(name=repository_name)
+        try:
+            repository_info = self.client.get_repo(name=repository_name)
+        except UnknownObjectException:
+            raise RepositoryNotFound(repository_name) from None
         output = {
             "repository_name": repository_info.name,
             "repository_description": (
                 repository_info.description if repository_info.description else ""
             ),
+            "default_branch": repository_info.default_branch,
             "clone_url": repository_info.clone_url,
         }
         return output
@@ -97,3 +125,114 @@ class GithubModule(GitPlatform):
             "clone_url": repository_info.clone_url,
         }
         return output
+
+    def create_repositories_bulk(self, repositories: list[dict]) -> dict[str, dict]:
+        """
+        Creates several Github repositories, using one GraphQL request per batch of repositories.
+
+        Args:
+            repositories (list[dict]): The repository_name and repository_description of each repository to create.
+
+        Returns:
+            dict[str, dict]: The repository object of each created repository, keyed by repository name.
+        """
+        output = {}
+        for i in range(0, len(repositories), 20):
+            batch = repositories[i : i + 20]
+            # Each repository is created by an aliased mutation, GitHub runs them one after the other.
+            # The values are inlined as JSON strings, which are valid GraphQL string literals
+            mutations = [
+                f"r{j}: createRepository(input: {{ownerId: {json.dumps(self.client.node_id)}, "
+                f"name: {json.dumps(repository['repository_name'])}, "
+                f"description: {json.dumps(repository.get('repository_description') or '')}, "
+                "visibility: PRIVATE}) { repository { name description url } }"
+                for j, repository in enumerate(batch)
+            ]
+            response = self._graphql(f"mutation {{ {' '.join(mutations)} }}")
+
+            # A failed mutation does not roll back the others, its repository is left to the caller
+            for error in response.get("errors", []):
+                logging.warning(
+                    "Failed to create a Github repository: %s", error.get("message")
+                )
+            for result in (response.get("data") or {}).values():
+                if result is None:
+                    continue
+                repository_info = result["repository"]
+                output[repository_info["name"]] = {
+                    "repository_name": repository_info["name"],
+                    "repository_description": repository_info["description"],
+                    "clone_url": f"{repository_info['url']}.git",
+                }
+
+        return output
+
+    def get_empty_repositories(self, repository_names: list[str]) -> frozenset[str]:
+        """
+        Gets the existing Github repositories that have no commits, using one GraphQL request per batch of repositories.
+
+        Args:
+            repository_names (list[str]): The names of the existing repositories to check.
+
+        Returns:
+            frozenset: The names of the empty repositories.
+        """
+        empty_repositories = set()
+        for i in range(0, len(repository_names), 100):
+            batch = repository_names[i : i + 100]
+            queries = [
+                f"r{j}: repository(owner: {json.dumps(self.client.login)}, "
+                f"name: {json.dumps(repository_name)}) {{ isEmpty }}"
+                for j, repository_name in enumerate(batch)
+            ]
+            response = self._graphql(f"query {{ {' '.join(queries)} }}")
+
+            # The repositories deleted since they were listed have no result
+            data = response.get("data") or {}
+            for j, repository_name in enumerate(batch):
+                if (data.get(f"r{j}") or {}).get("isEmpty"):
+                    empty_repositories.add(repository_name)
+
+        return frozenset(empty_repositories)
+
+    def _graphql(self, query: str) -> dict:
+        """
+        Runs a GraphQL request, the errors of some of its fields are returned with the data of the others.
+
+        Args:
+            query (str): The GraphQL query or mutation.
+
+        Returns:
+            dict: The GraphQL response, with its data and errors.
+
+        Raises:
+            GithubException: If the request failed as a whole, eg: invalid credentials.
+        """
+        try:
+            _, response = self.client._requester.graphql_query(query, {})
+        except GithubException as ex:
+            if not isinstance(ex.data, dict) or "errors" not in ex.data:
+                raise
+            response = ex.data
+        return response
+
+    def get_branch_commit(
+        self, repository_name: str, branch_name: str
+    ) -> Optional[str]:
+        """
+        Gets the id of the latest commit of a Github repository branch.
+
+        Args:
+            repository_name (str): The name of the repository.
+            branch_name (str): The name of the branch.
+
+        Returns:
+            Optional[str]: The commit id, None if the branch does not exist.
+        """
+        try:
+            branch_info = self.client.get_repo(name=repository_name).get_branch(
+                branch_name
+            )
+        except UnknownObjectException:
+            return None
+        return branch_info.commit.sha
@@ -2,22 +2,31 @@
 # SPDX-License-Identifier: MIT-0
 
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from getpass import getpass
+from itertools import islice
 from typing import Optional
 
-from gitlab import Gitlab
-from platform_modules.platform_interface import GitPlatform
+from gitlab import Gitlab, GitlabGetError
+from requests import Session
+from requests.adapters import HTTPAdapter
+from platform_modules.platform_interface import GitPlatform, RepositoryNotFound
 
 
 class GitlabModule(GitPlatform):
 
-    def __init__(self, *args, **kwargs):
+    def __init__(self, *args, max_pool_connections: int = 10, **kwargs):
         super().__init__(self)
         self.prompt_config()
+        # Keep a connection open for each concurrent migration worker, requests only keeps 10 by default
+        session = Session()
+        adapter = HTTPAdapter(pool_maxsize=max_pool_connections)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
         self.client = (
-            Gitlab(private_token=self.token, url=self.custom_hostname)
+            Gitlab(private_token=self.token, url=self.custom_hostname, session=session)
             if self.custom_hostname
-            else Gitlab(private_token=self.token)
+            else Gitlab(private_token=self.token, session=session)
         )
         self.client.auth()
 
@@ -35,11 +44,32 @@ class GitlabModule(GitPlatform):
         Returns:
             list: A list of repository names.
         """
-        # Get a list of repositories in the source account
-        list_repositories_response = self.client.projects.list(owned=True)
+        # Get the first page of repositories in the source account, its headers give the total number of pages
+        list_repositories_response = self.client.projects.list(
+            owned=True, per_page=100, iterator=True
+        )
+        if list_repositories_response.total_pages is None:
+            # Gitlab omits the pagination headers for large result sets, follow the pages sequentially
+            return [repo.path_with_namespace for repo in list_repositories_response]
+
         repository_list = [
-            repo.path_with_namespace for repo in list_repositories_response
+            repo.path_with_namespace
+            for repo in islice(
+                list_repositories_response, list_repositories_response.per_page
+            )
         ]
+        # Fetch the remaining pages concurrently
+        with ThreadPoolExecutor() as executor:
+            repository_list.extend(
+                repo.path_with_namespace
+                for page in executor.map(
+                    lambda page: self.client.projects.list(
+                        owned=True, per_page=100, page=page
+                    ),
+                    range(2, list_repositories_response.total_pages + 1),
+                )
+                for repo in page
+            )
 
         return repository_list
 
@@ -52,11 +82,21 @@ class GitlabModule(GitPlatform):
 
         Returns:
             dict: The repository object.
+
+        Raises:
+            RepositoryNotFound: If the repository does not exist.
         """
-        repository_info = self.client.projects.get(repository_name)
+        try:
+            repository_info = self.client.projects.get(repository_name)
+        except GitlabGetError as ex:
+            # Other errors (eg: permissions) are not treated as a missing repository
+            if ex.response_code != 404:
+                raise
+            raise RepositoryNotFound(repository_name) from None
         output = {
             "repository_name": repository_info.name,
             "repository_description": repository_info.description,
+            "default_branch": repository_info.default_branch,
             "clone_url": repository_info.ssh_url_to_repo,
         }
         return output
@@ -87,3 +127,26 @@ class GitlabModule(GitPlatform):
             "clone_url": repository_info.ssh_url_to_repo,
         }
         return output
+
+    def get_branch_commit(
+        self, repository_name: str, branch_name: str
+    ) -> Optional[str]:
+        """
+        Gets the id of the latest commit of a Gitlab repository branch.
+
+        Args:
+            repository_name (str): The name of the repository.
+            branch_name (str): The name of the branch.
+
+        Returns:
+            Optional[str]: The commit id, None if the branch does not exist.
+        """
+        try:
+            branch_info = self.client.projects.get(
+                repository_name, lazy=True
+            ).branches.get(branch_name)
+        except GitlabGetError as ex:
+            if ex.response_code != 404:
+                raise
+            return None
+        return branch_info.commit.get("id")
@@ -2,6 +2,13 @@
 # SPDX-License-Identifier: MIT-0
 
 from abc import ABC, abstractmethod
+from typing import Optional
+
+
+class RepositoryNotFound(Exception):
+    """
+    Raised when a repository does not exist on the platform.
+    """
 
 
 class GitPlatform(ABC):
@@ -41,6 +48,9 @@ class GitPlatform(ABC):
 
         Returns:
             dict: The repository object.
+
+        Raises:
+            RepositoryNotFound: If the repository does not exist.
         """
         pass
 
@@ -58,3 +68,42 @@ class GitPlatform(ABC):
             dict: The repository object.
         """
         pass
+
+    @classmethod
+    @abstractmethod
+    def get_branch_commit(cls, repository_name, branch_name, **kwargs) -> Optional[str]:
+        """
+        Gets the id of the latest commit of a repository branch.
+
+        Args:
+            repository_name (str): The name of the repository.
+            branch_name (str): The name of the branch.
+
+        Returns:
+            Optional[str]: The commit id, None if the branch does not exist.
+        """
+        pass
+
+    def get_existing_repositories(self, repository_names: list[str]) -> frozenset[str]:
+        """
+        Gets the repositories that already exist on the platform, using a single listing of the platform repositories.
+
+        Args:
+            repository_names (list[str]): The names of the repositories to check.
+
+        Returns:
+            frozenset: The names of the repositories that exist on the platform.
+        """
+        return frozenset(self.list_repositories()).intersection(repository_names)
+
+    def get_empty_repositories(self, repository_names: list[str]) -> frozenset[str]:
+        """
+        Gets the existing repositories that have no commits, eg: created by a migration that failed before the push.
+
+        Args:
+            repository_names (list[str]): The names of the existing repositories to check.
+
+        Returns:
+            frozenset: The names of the empty repositories, platforms that cannot tell return an empty set.
+        """
+        return frozenset()
@@ -1,21 +1,22 @@
 # Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
 # SPDX-License-Identifier: MIT-0
 
-from platform_modules.codecommit import CodecommitModule
-from platform_modules.github import GithubModule
-from platform_modules.gitlab import GitlabModule
+from importlib import import_module
 
-PLATFORMS = ["codecommit", "github", "gitlab"]
+# Platform modules are imported on demand so that only the SDK of the chosen platforms is loaded
+_PLATFORM_MODULES = {
+    "codecommit": ("platform_modules.codecommit", "CodecommitModule"),
+    "github": ("platform_modules.github", "GithubModule"),
+    "gitlab": ("platform_modules.gitlab", "GitlabModule"),
+}
 
+PLATFORMS = list(_PLATFORM_MODULES)
 
-def get_platform_client(platform: str):
 
-    match platform:
-        case "codecommit":
-            return CodecommitModule()
-        case "github":
-            return GithubModule()
-        case "gitlab":
-            return GitlabModule()
-        case _:
-            raise Exception("Non supported git platform")
+def get_platform_client(platform: str, **kwargs):
+
+    try:
+        module_name, class_name = _PLATFORM_MODULES[platform]
+    except KeyError:
+        raise Exception("Non supported git platform")
+    return getattr(import_module(module_name), class_name)(**kwargs)
@@ -2,11 +2,21 @@
 # SPDX-License-Identifier: MIT-0
 
 import argparse
+import itertools
 import logging
+import os
+import sys
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait
+from queue import Queue
 from shutil import rmtree
+from subprocess import CalledProcessError
+from typing import Optional
 
-from git import GitCommandError, Repo
-from platform_modules import PLATFORMS, get_platform_client
+from git_utils import clone_repository, close_ssh_connections, push_repository
+from platform_modules import PLATFORMS, RepositoryNotFound, get_platform_client
+from platform_modules.platform_interface import GitPlatform
 from utils import choose_platform, exclude_items_from_user_input
 
 user_messages = [
@@ -17,14 +27,301 @@ List of repositories in the source platform:
 Repositories to exclude: (eg: "1 2 3", "1-3", "^4" or repo name)
 Note: This list will be used to filter the list of repositories to be migrated.
 Note: If you want to migrate all repositories, leave this field empty.
+Note: Enter "existing" to exclude the repositories already migrated to the destination platform.
 """,
 ]
 
+# Deletes the local clones off the critical path, the next clone or push does not wait for the unlink calls
+cleanup_executor = ThreadPoolExecutor(max_workers=2)
+
+# Both stages finish repositories, the progress counter is shared between their threads
+progress_lock = threading.Lock()
+
+
+def _log_progress(repo: str, processed: itertools.count, total: int) -> None:
+    """
+    Logs that a repository has been migrated, skipped or has failed.
+
+    Args:
+        repo (str): The name of the repository in the source platform.
+        processed (itertools.count): The counter of the processed repositories.
+        total (int): The number of repositories to migrate.
+    """
+    with progress_lock:
+        i = next(processed)
+    logging.info("Processed repository %d/%d: %s", i, total, repo)
+
+
+def _clone_repository(
+    repo: str,
+    source_client: GitPlatform,
+    destination_client: GitPlatform,
+    repo_prefix: str,
+    existing_repositories: frozenset[str],
+    handoff: Queue,
+    stop_flag: threading.Event,
+    tmp_root: str,
+    shallow: bool = False,
+    partial_clone: bool = False,
+    update_existing: bool = False,
+    default_branch_only: bool = False,
+    repository_infos: Optional[dict[str, dict]] = None,
+    cache_dir: Optional[str] = None,
+    empty_repositories: frozenset[str] = frozenset(),
+) -> Optional[tuple[str, int, Optional[str]]]:
+    """
+    Clones a source repository and hands it over to the push stage.
+
+    Args:
+        repo (str): The name of the repository in the source platform.
+        source_client (GitPlatform): The source platform client.
+        destination_client (GitPlatform): The destination platform client.
+        repo_prefix (str): The prefix to add to the repository name in the destination platform.
+        existing_repositories (frozenset[str]): The repositories that already exist in the destination platform.
+        handoff (Queue): The queue feeding cloned repositories to the push stage.
+        stop_flag (threading.Event): The event set when the migration failed and pending work must be abandoned.
+        tmp_root (str): The temporary directory to clone the repository into.
+        shallow (bool): Whether to only migrate the latest commit of the default branch.
+        partial_clone (bool): Whether to defer the download of the file contents until they are pushed.
+        update_existing (bool): Whether to migrate again the existing destination repositories that are behind the source.
+        default_branch_only (bool): Whether to only migrate the default branch and its tags, with its full history.
+        repository_infos (Optional[dict[str, dict]]): The source repository objects already fetched, keyed by repository name.
+        cache_dir (Optional[str]): The directory keeping the clones between runs, the clones are made in tmp_root if None.
+        empty_repositories (frozenset[str]): The existing destination repositories without commits, they are always migrated.
+
+    Returns:
+        Optional[tuple[str, int, Optional[str]]]: The repository name, 0 if it was skipped, 1 if it failed or 2 if it was
+            abandoned after another failure, and the error message. None if it was handed over to the push stage.
+    """
+    if stop_flag.is_set():
+        return repo, 2, None
+
+    # Any failure stops the migration, not only the git errors, eg: the source repository cannot be fetched
+    try:
+        destination_name = f"{repo_prefix}{repo}"
+        destination_exists = destination_name in existing_repositories
+        # Eg: created upfront by a previous run that failed before pushing them
+        destination_empty = destination_name in empty_repositories
+        if destination_exists and not destination_empty and not update_existing:
+            logging.warning(
+                "%s already exists in destination, ignoring", destination_name
+            )
+            return repo, 0, None
+
+        # Fetch source repository details, unless they were fetched to create the destination repository upfront
+        if repository_infos and repo in repository_infos:
+            repository_info = repository_infos[repo]
+        else:
+            repository_info = source_client.get_repository(repository_name=repo)
+
+        if destination_empty:
+            logging.info("%s is empty in destination, migrating it", destination_name)
+        elif destination_exists:
+            # Only migrate again the repositories whose default branch differs from the source, eg: after a failed push
+            default_branch = repository_info.get("default_branch")
+            # An empty source repository has no default branch, there is nothing to migrate
+            if not default_branch:
+                logging.info("%s is empty in source, ignoring", repo)
+                return repo, 0, None
+            source_commit = source_client.get_branch_commit(
+                repository_name=repo, branch_name=default_branch
+            )
+            if source_commit is not None and source_commit == (
+                destination_client.get_branch_commit(
+                    repository_name=destination_name, branch_name=default_branch
+                )
+            ):
+                logging.info(
+                    "%s is up to date in destination, ignoring", destination_name
+                )
+                return repo, 0, None
+            logging.info("%s is behind the source, updating it", destination_name)
+
+        # If the repository does not exist or is stale in the destination account, migrate the contents
+        logging.debug("Cloning %s from source", repo)
+
+        if cache_dir:
+            # Reuse the clone of a previous run, only the changes since then are fetched
+            path = os.path.join(cache_dir, f"{repo}.git")
+            os.makedirs(path, exist_ok=True)
+        else:
+            # Clone the repository locally to the temporary directory
+            path = tempfile.mkdtemp(prefix=f"{repo.replace('/', '-')}-", dir=tmp_root)
+        try:
+            clone_repository(
+                url=repository_info.get("clone_url"),
+                path=path,
+                shallow=shallow,
+                partial_clone=partial_clone,
+                default_branch_only=default_branch_only,
+            )
+        except CalledProcessError as ex:
+            logging.error("Failed to clone %s from source\n%s", repo, ex.stderr)
+            stop_flag.set()
+            return repo, 1, ex.stderr
+
+        if stop_flag.is_set():
+            # The migration failed while this repository was cloning, drop the clone
+            if not cache_dir:
+                cleanup_executor.submit(rmtree, path, ignore_errors=True)
+            return repo, 2, None
+
+        # Blocks while the push stage is busy, which caps the number of clones on disk
+        handoff.put((repo, repository_info, path, destination_exists))
+        return None
+    except Exception as ex:
+        logging.error("An unexpected error occurred while cloning %s: %s", repo, ex)
+        stop_flag.set()
+        return repo, 1, str(ex)
+
+
+def _push_repository(
+    repo: str,
+    repository_info: dict,
+    path: str,
+    destination_exists: bool,
+    destination_client: GitPlatform,
+    repo_prefix: str,
+    keep_clones: bool = False,
+    created_repositories: Optional[dict[str, dict]] = None,
+) -> tuple[str, int, Optional[str]]:
+    """
+    Creates the destination repository if needed and pushes a local clone to it.
+
+    Args:
+        repo (str): The name of the repository in the source platform.
+        repository_info (dict): The source repository object.
+        path (str): The local path of the source repository clone.
+        destination_exists (bool): Whether the repository already exists in the destination platform.
+        destination_client (GitPlatform): The destination platform client.
+        repo_prefix (str): The prefix to add to the repository name in the destination platform.
+        keep_clones (bool): Whether to keep the local clone until the end of the migration.
+        created_repositories (Optional[dict[str, dict]]): The destination repository objects created upfront, keyed by repository name.
+
+    Returns:
+        tuple[str, int, Optional[str]]: The repository name, 0 if it was migrated or 1 if the push failed, and the error message.
+    """
+    destination_name = f"{repo_prefix}{repository_info.get('repository_name', repo)}"
+    destination_repository = None
+    if destination_exists:
+        existing_name = f"{repo_prefix}{repo}"
+        try:
+            destination_repository = destination_client.get_repository(
+                repository_name=existing_name
+            )
+        except RepositoryNotFound:
+            # Deleted since the existence check, it is created again below
+            logging.warning("%s no longer exists in destination", existing_name)
+
+    if destination_repository is None:
+        if created_repositories and destination_name in created_repositories:
+            destination_repository = created_repositories[destination_name]
+        else:
+            # Create the repository in the destination account with the same name and description as the source repository
+            destination_repository = destination_client.create_repository(
+                repository_name=destination_name,
+                repository_description=repository_info.get(
+                    "repository_description", ""
+                ),
+            )
+
+    # Push the repository content to the destination repository
+    logging.debug("Pushing %s to destination", repo)
+    try:
+        push_repository(path=path, url=destination_repository.get("clone_url"))
+    except CalledProcessError as ex:
+        if "pre-receive hook declined" in ex.stderr:
+            logging.warning(
+                "Failed to push %s to destination, do you need to set up security pre-commits before pushing to remote?\n%s",
+                repo,
+                ex.stderr,
+            )
+        else:
+            logging.warning("Failed to push %s to destination\n%s", repo, ex.stderr)
+        return repo, 1, ex.stderr
+
+    # Delete the local repository clone after it has been migrated
+    if not keep_clones:
+        cleanup_executor.submit(rmtree, path, ignore_errors=True)
+    logging.info("Migrated %s to destination", repo)
+
+    return repo, 0, None
+
+
+def _push_worker(
+    handoff: Queue,
+    stop_flag: threading.Event,
+    destination_client: GitPlatform,
+    repo_prefix: str,
+    processed: itertools.count,
+    total: int,
+    keep_clones: bool = False,
+    created_repositories: Optional[dict[str, dict]] = None,
+) -> list[tuple[str, int, Optional[str]]]:
+    """
+    Pushes the cloned repositories received from the clone stage until a None sentinel is received.
+
+    Args:
+        handoff (Queue): The queue feeding cloned repositories to the push stage.
+        stop_flag (threading.Event): The event set when the migration failed and pending work must be abandoned.
+        destination_client (GitPlatform): The destination platform client.
+        repo_prefix (str): The prefix to add to the repository names in the destination platform.
+        processed (itertools.count): The counter of the processed repositories.
+        total (int): The number of repositories to migrate.
+        keep_clones (bool): Whether to keep the local clones until the end of the migration.
+        created_repositories (Optional[dict[str, dict]]): The destination repository objects created upfront, keyed by repository name.
+
+    Returns:
+        list[tuple[str, int, Optional[str]]]: The repository name, status (2 if the push was abandoned after another
+            failure) and error message of each received repository.
+    """
+    results = []
+    while (item := handoff.get()) is not None:
+        repo, repository_info, path, destination_exists = item
+        if stop_flag.is_set():
+            # Keep draining the queue so the clone stage does not block, but skip the push
+            if not keep_clones:
+                cleanup_executor.submit(rmtree, path, ignore_errors=True)
+            results.append((repo, 2, None))
+            continue
+
+        try:
+            result = _push_repository(
+                repo,
+                repository_info,
+                path,
+                destination_exists,
+                destination_client,
+                repo_prefix,
+                keep_clones=keep_clones,
+                created_repositories=created_repositories,
+            )
+        except Exception as ex:
+            logging.error("An unexpected error occurred: %s", ex)
+            result = (repo, 1, str(ex))
+
+        results.append(result)
+        _log_progress(repo, processed, total)
+        if result[1] != 0:
+            stop_flag.set()
+
+    return results
+
 
 def main(
     repo_prefix: str,
     migrate_all: bool = False,
     dry_run: bool = False,
+    jobs: Optional[int] = None,
+    shallow: bool = False,
+    tmpdir: Optional[str] = None,
+    partial_clone: bool = False,
+    keep_clones: bool = False,
+    update_existing: bool = False,
+    default_branch_only: bool = False,
+    clone_jobs: Optional[int] = None,
+    push_jobs: Optional[int] = None,
+    cache_dir: Optional[str] = None,
 ):
     """
     Migrates all repositories from one Git platform to another.
@@ -35,13 +332,43 @@ def main(
         repo_prefix (str): The prefix to add to the repository names in the destination account.
         source_region (str): The AWS region to use for the source account.
         destination_region (str): The AWS region to use for the destination account.
+        jobs (Optional[int]): The number of repositories to migrate concurrently, defaults to four per CPU (up to 32).
+        shallow (bool): Whether to only migrate the latest commit of the default branch.
+        tmpdir (Optional[str]): The directory to clone the repositories into, defaults to $MIGRATION_TMPDIR or the system temporary directory.
+        partial_clone (bool): Whether to defer the download of the file contents until they are pushed.
+        keep_clones (bool): Whether to keep the local clones until the end of the migration instead of deleting them after each push.
+        update_existing (bool): Whether to migrate again the existing destination repositories whose default branch differs from the source.
+        default_branch_only (bool): Whether to only migrate the default branch and its tags, with its full history.
+        clone_jobs (Optional[int]): The number of repositories to clone concurrently, defaults to jobs.
+        push_jobs (Optional[int]): The number of repositories to push concurrently, defaults to jobs.
+        cache_dir (Optional[str]): The directory keeping the clones between runs so that the next runs only fetch the changes, defaults to no cache.
     """
 
     if len(repo_prefix) > 0 and repo_prefix[-1] != "-":
         repo_prefix = repo_prefix + "-"
 
+    # Clones and pushes mostly wait on the network, run several per CPU
+    if not jobs:
+        jobs = min(32, (os.cpu_count() or 4) * 4)
+    # Sized independently when the download and upload bandwidths differ
+    clone_jobs = clone_jobs or jobs
+    push_jobs = push_jobs or jobs
+
+    # Only the full migrations are cached, the single-branch clones cannot be fetched into incrementally
+    if cache_dir and (shallow or default_branch_only):
+        logging.warning(
+            "--cache_dir is ignored with --shallow and --default_branch_only"
+        )
+        cache_dir = None
+    elif cache_dir:
+        cache_dir = os.path.expanduser(cache_dir)
+
     source_platform = choose_platform(PLATFORMS, source=True)
-    source_client = get_platform_client(platform=source_platform)
+    # Every migration worker may hold a connection at the same time
+    max_pool_connections = max(10, clone_jobs + push_jobs)
+    source_client = get_platform_client(
+        platform=source_platform, max_pool_connections=max_pool_connections
+    )
 
     # Get a list of repositories in the source account
     source_repository_list = source_client.list_repositories()
@@ -53,12 +380,35 @@ def main(
         )
         return 0
 
+    destination_platform = choose_platform(PLATFORMS, source=False)
+    destination_client = get_platform_client(
+        platform=destination_platform, max_pool_connections=max_pool_connections
+    )
+
+    # Check which repositories already exist in the destination account before starting the git work
+    existing_repositories = destination_client.get_existing_repositories(
+        [f"{repo_prefix}{repo}" for repo in source_repository_list]
+    )
+    empty_repositories = destination_client.get_empty_repositories(
+        sorted(existing_repositories)
+    )
+
     # If not specified otherwise, ask the user about repositories to exclude from the list of repositories to be migrated
     if migrate_all:
         to_migrate_repository_list = source_repository_list
     else:
+        # The repositories migrated by a previous run are shown so they can be excluded at once
         to_migrate_repository_list = exclude_items_from_user_input(
-            source_repository_list, user_messages
+            source_repository_list,
+            user_messages,
+            tags={
+                "existing": frozenset(
+                    repo
+                    for repo in source_repository_list
+                    if f"{repo_prefix}{repo}"
+                    in existing_repositories - empty_repositories
+                )
+            },
         )
 
         if len(to_migrate_repository_list) > 0:
@@ -76,84 +426,156 @@ def main(
             print("No repositories selected for migration.")
             return 0
 
-    destination_platform = choose_platform(PLATFORMS, source=False)
-    destination_client = get_platform_client(platform=destination_platform)
-
     if dry_run:
         logging.info("Dry run enabled, not migrating any repositories.")
         return 0
 
-    try:
-        # Loop over each repository to migrate
-        for i, repo in enumerate(to_migrate_repository_list):
-            logging.info(
-                "Migrating repository {}/{}: {}".format(
-                    i + 1, len(to_migrate_repository_list), repo
-                )
-            )
+    # A tmpfs (eg: /dev/shm) can be given to speed up the clones, which are write heavy
+    tmp_root = tempfile.mkdtemp(
+        prefix="repo-migration-", dir=tmpdir or os.environ.get("MIGRATION_TMPDIR")
+    )
+
+    total = len(to_migrate_repository_list)
+    processed = itertools.count(1)
 
+    results = []
+    repository_infos = {}
+    created_repositories = {}
+    try:
+        # Platforms able to create several repositories per API call (eg: Github GraphQL) create the missing ones upfront
+        if hasattr(destination_client, "create_repositories_bulk"):
+            to_create_repository_list = [
+                repo
+                for repo in to_migrate_repository_list
+                if f"{repo_prefix}{repo}" not in existing_repositories
+            ]
             try:
-                # Try if a repository with the same name already exists in the destination account
-                destination_client.get_repository(
-                    repository_name=f"{repo_prefix}{repo}"
+                with ThreadPoolExecutor(max_workers=clone_jobs) as executor:
+                    repository_infos = dict(
+                        zip(
+                            to_create_repository_list,
+                            executor.map(
+                                source_client.get_repository, to_create_repository_list
+                            ),
+                        )
+                    )
+                created_repositories = destination_client.create_repositories_bulk(
+                    [
+                        {
+                            "repository_name": f"{repo_prefix}{repository_info.get('repository_name', repo)}",
+                            "repository_description": repository_info.get(
+                                "repository_description", ""
+                            ),
+                        }
+                        for repo, repository_info in repository_infos.items()
+                    ]
                 )
+            except Exception as ex:
+                # The migration workers then fetch and create the repositories one by one
                 logging.warning(
-                    f"{repo_prefix}{repo} already exists in destination, ignoring"
-                )
-
-            except Exception:
-                # If the repository does not exist in the destination account, create it and migrate the contents
-                logging.debug(f"Cloning {repo} from source")
-
-                # Fetch source repository details
-                repository_info = source_client.get_repository(repository_name=repo)
-
-                # Clone the repository locally to the temporary directory
-                git_repo = Repo.clone_from(
-                    url=repository_info.get("clone_url"),
-                    to_path=f"./tmp/{repo}",
-                    allow_unsafe_protocols=True,
-                    mirror=True,
-                )
-
-                # Create the repository in the destination account with the same name and description as the source repository
-                destination_repository = destination_client.create_repository(
-                    repository_name=f"{repo_prefix}{repository_info.get("repository_name", repo)}",
-                    repository_description=repository_info.get(
-                        "repository_description", ""
-                    ),
+                    "Failed to create the destination repositories upfront: %s", ex
                 )
 
-                # Add it as a remote to the local repository clone
-                remote = git_repo.create_remote(
-                    "destination",
-                    url=destination_repository.get("clone_url"),
-                    allow_unsafe_protocols=True,
+        # Clone and push are pipelined: cloning uses download bandwidth while pushing uses upload bandwidth
+        # A few clones wait for each push worker so it never idles, which bounds the clones on disk
+        handoff = Queue(maxsize=2 * push_jobs)
+        # Set on the first failure to abandon the remaining clones and pushes
+        stop_flag = threading.Event()
+        with ThreadPoolExecutor(
+            max_workers=clone_jobs
+        ) as clone_executor, ThreadPoolExecutor(max_workers=push_jobs) as push_executor:
+            push_futures = [
+                push_executor.submit(
+                    _push_worker,
+                    handoff,
+                    stop_flag,
+                    destination_client,
+                    repo_prefix,
+                    processed,
+                    total,
+                    # The cached clones are kept for the next runs
+                    keep_clones=keep_clones or bool(cache_dir),
+                    created_repositories=created_repositories,
                 )
+                for _ in range(push_jobs)
+            ]
+            clone_futures = {
+                clone_executor.submit(
+                    _clone_repository,
+                    repo,
+                    source_client,
+                    destination_client,
+                    repo_prefix,
+                    existing_repositories,
+                    handoff,
+                    stop_flag,
+                    tmp_root,
+                    shallow=shallow,
+                    partial_clone=partial_clone,
+                    update_existing=update_existing,
+                    default_branch_only=default_branch_only,
+                    repository_infos=repository_infos,
+                    cache_dir=cache_dir,
+                    empty_repositories=empty_repositories,
+                ): repo
+                for repo in to_migrate_repository_list
+            }
+            collected_futures = set()
+            try:
+                for future in as_completed(clone_futures):
+                    collected_futures.add(future)
+                    # The handed over repositories are reported by the push stage
+                    if (result := future.result()) is not None:
+                        results.append(result)
+                        if result[1] != 2:
+                            _log_progress(result[0], processed, total)
+                    if stop_flag.is_set():
+                        # Cancel the clones that have not started yet
+                        for pending_future in clone_futures:
+                            pending_future.cancel()
+                        break
+            except BaseException:
+                # Eg: Ctrl-C, abandon the pending clones instead of waiting for all of them
+                stop_flag.set()
+                for pending_future in clone_futures:
+                    pending_future.cancel()
+                raise
+            finally:
+                # Stop the push workers once every clone has been handed over
+                wait(clone_futures)
+                for _ in push_futures:
+                    handoff.put(None)
 
-                # Push the repository content to the destination remote
-                logging.debug(f"Pushing {repo} to destination")
-                try:
-                    remote.push(allow_unsafe_protocols=True, all=True)
-                except GitCommandError as ex:
-                    logging.warning(
-                        f"Failed to push {repo} to destination, do you need to set up security pre-commits before pushing to remote?\n{ex}"
-                    )
-                    return 1
-                except Exception as ex:
-                    logging.error(f"An unexpected error occurred: {ex}")
-                    return 1
+            # Collect the clones that were still running or never started when the migration stopped
+            for future in clone_futures:
+                if future in collected_futures:
+                    continue
+                if future.cancelled():
+                    results.append((clone_futures[future], 2, None))
+                elif (result := future.result()) is not None:
+                    results.append(result)
 
-                # Delete the local repository clone after it has been migrated
-                rmtree(f"./tmp/{repo}")
+            for future in push_futures:
+                results.extend(future.result())
 
-        logging.info("All repositories have been migrated successfully")
+        failed_repositories = [repo for repo, status, _ in results if status == 1]
+        abandoned_repositories = [repo for repo, status, _ in results if status == 2]
+        if failed_repositories:
+            logging.error("Failed to migrate: %s", ", ".join(failed_repositories))
+        if abandoned_repositories:
+            logging.error(
+                "Not migrated after the failure: %s", ", ".join(abandoned_repositories)
+            )
+        if not failed_repositories and not abandoned_repositories:
+            logging.info("All repositories have been migrated successfully")
 
     finally:
         # Delete the temporary directory after all repositories have been migrated
-        rmtree("./tmp", ignore_errors=True)
+        cleanup_executor.shutdown(wait=True)
+        rmtree(tmp_root, ignore_errors=True)
+        close_ssh_connections()
 
-    return 0
+    return 1 if failed_repositories or abandoned_repositories else 0
 
 
 if __name__ == "__main__":
@@ -176,12 +598,77 @@ if __name__ == "__main__":
         default="INFO",
         help="Set the logging level (DEBUG, INFO, WARNING, ERROR)",
     )
+    parser.add_argument(
+        "--jobs",
+        "--concurrency",
+        type=int,
+        help="Number of repositories to migrate concurrently (defaults to four per CPU, up to 32)",
+    )
+    parser.add_argument(
+        "--clone_jobs",
+        type=int,
+        help="Number of repositories to clone concurrently (defaults to --jobs)",
+    )
+    parser.add_argument(
+        "--push_jobs",
+        type=int,
+        help="Number of repositories to push concurrently (defaults to --jobs)",
+    )
+    parser.add_argument(
+        "--shallow",
+        action="store_true",
+        help="Only migrate the latest commit of the default branch (drops history, other branches and tags)",
+    )
+    parser.add_argument(
+        "--tmpdir",
+        help="Directory to clone the repositories into, eg: /dev/shm (defaults to $MIGRATION_TMPDIR or the system temporary directory)",
+    )
+    parser.add_argument(
+        "--partial_clone",
+        action="store_true",
+        help="Clone without the file contents and download them while pushing, halves the disk usage (requires partial clone support on the source platform)",
+    )
+    parser.add_argument(
+        "--keep_clones",
+        action="store_true",
+        help="Keep the local clones until the end of the migration instead of deleting them after each push (requires disk space for all the repositories)",
+    )
+    parser.add_argument(
+        "--update_existing",
+        action="store_true",
+        help="Migrate again the repositories that already exist in the destination when their default branch differs from the source, eg: after a failed migration (the destination branches and tags are overwritten, cannot be used with --shallow)",
+    )
+    parser.add_argument(
+        "--default_branch_only",
+        action="store_true",
+        help="Only migrate the default branch with its full history and tags (drops the other branches)",
+    )
+    parser.add_argument(
+        "--cache_dir",
+        help="Directory keeping the clones between runs, eg: ~/.cache/repo-migration, the next runs only fetch the changes since the previous one (requires disk space for all the repositories)",
+    )
     args = parser.parse_args()
+    # The rewritten root commit of a shallow migration never matches the source, every run would
+    # overwrite the destination history again
+    if args.update_existing and args.shallow:
+        parser.error("--update_existing cannot be used with --shallow")
 
     logging.basicConfig(level=logging.getLevelName(args.log_level))
 
-    main(
-        args.repo_prefix,
-        migrate_all=args.migrate_all,
-        dry_run=args.dry_run,
+    sys.exit(
+        main(
+            args.repo_prefix,
+            migrate_all=args.migrate_all,
+            dry_run=args.dry_run,
+            jobs=args.jobs,
+            shallow=args.shallow,
+            tmpdir=args.tmpdir,
+            partial_clone=args.partial_clone,
+            keep_clones=args.keep_clones,
+            update_existing=args.update_existing,
+            default_branch_only=args.default_branch_only,
+            clone_jobs=args.clone_jobs,
+            push_jobs=args.push_jobs,
+            cache_dir=args.cache_dir,
+        )
     )
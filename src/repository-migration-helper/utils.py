@@ -1,6 +1,8 @@
 # Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
 # SPDX-License-Identifier: MIT-0
 
+from typing import Collection, Optional
+
 
 def exclude_items_from_user_input(
     L: list,
@@ -8,6 +10,7 @@ def exclude_items_from_user_input(
         "List of items:",
         'Items to exclude: (eg: "1 2 3", "1-3", "^4" or item value)',
     ],
+    tags: Optional[dict[str, Collection]] = None,
 ) -> list:
     """
     Get a list of repositories to exclude from the list of repositories to be migrated.
@@ -15,19 +18,24 @@ def exclude_items_from_user_input(
     Args:
         L (list): Initial list of items.
         messages ([str]): List of messages to display to the user.
+        tags (Optional[dict[str, Collection]]): Named groups of items, shown next to their items and excluded at once by entering their name.
 
     Return:
         :return: List of items excluding the ones specified by the user.
         :rtype: list
     """
+    tags = tags or {}
+
     print(messages[0])
     for i, item in enumerate(L):
-        print(f"{i}. {item}")
+        item_tags = [tag for tag, tagged_items in tags.items() if item in tagged_items]
+        print(f"{i}. {item} ({', '.join(item_tags)})" if item_tags else f"{i}. {item}")
 
     print(messages[1])
     user_input = input().split()
 
     exclusion_indexes = []
+    name_to_index = {name: i for i, name in enumerate(L)}
 
     for item in user_input:
         if item.startswith("^"):
@@ -37,9 +45,18 @@ def exclude_items_from_user_input(
             exclusion_indexes.extend(range(int(start), int(end) + 1))
         elif item.isdigit():
             exclusion_indexes.append(int(item))
+        elif item not in name_to_index and item in tags:
+            exclusion_indexes.extend(
+                name_to_index[name] for name in tags[item] if name in name_to_index
+            )
         else:
-            exclusion_indexes.append(L.index(item))
+            try:
+                exclusion_indexes.append(name_to_index[item])
+            except KeyError:
+                # Same error as the list.index lookup this dict replaces
+                raise ValueError(f"{item!r} is not in list") from None
 
+    exclusion_indexes = set(exclusion_indexes)
     return [k for i, k in enumerate(L) if i not in exclusion_indexes]
 
 